@@ -166,11 +166,37 @@ cmd:
 '''
 
 
+import functools
 import ipaddress
 from ansible.module_utils.basic import AnsibleModule
 __metaclass__ = type
 
 
+@functools.lru_cache(maxsize=4096)
+def normalize_cidr(route_entry):
+    """
+    Pads a CIDR entry like '10.12/16' to '10.12.0.0/16' and validates it.
+    Results are cached as routing tables repeat the same prefixes.
+
+    Arguments:
+    - route_entry (str): The raw CIDR route entry string.
+
+    Returns:
+    - str: Normalized route entry in valid CIDR format.
+
+    Raises:
+    - ValueError: If the entry is not a valid network.
+    """
+    base, prefix = route_entry.split("/")
+    base_parts = base.split(".")
+    while len(base_parts) < 4:  # Pad missing octets with '.0'
+        base_parts.append("0")
+    normalized_entry = ".".join(base_parts) + f"/{prefix}"
+    # Validate the normalized entry
+    ipaddress.ip_network(normalized_entry, strict=False)
+    return normalized_entry
+
+
 def normalize_route_entry(module, route_entry):
     """
     Normalize the route_entry to a valid CIDR(Classless Inter-Domain Routing) format.
@@ -185,14 +211,7 @@ def normalize_route_entry(module, route_entry):
     """
     if "/" in route_entry:  # Check if it looks like a CIDR entry
         try:
-            base, prefix = route_entry.split("/")
-            base_parts = base.split(".")
-            while len(base_parts) < 4:  # Pad missing octets with '.0'
-                base_parts.append("0")
-            normalized_entry = ".".join(base_parts) + f"/{prefix}"
-            # Validate the normalized entry
-            ipaddress.ip_network(normalized_entry, strict=False)
-            return normalized_entry
+            return normalize_cidr(route_entry)
         except Exception as e:
             module.fail_json(
                 changed=False,
@@ -217,28 +236,26 @@ def parse_routing_table(module):
 
     routing_table = []
     gateways = []
-    lines = stdout.splitlines()
-
-    for line in lines:
-        columns = line.split()
-        if not columns:
+    for line in stdout.splitlines():
+        # Only the destination and gateway columns are needed
+        columns = line.split(None, 2)
+        if len(columns) < 2:
             continue
         # Inspect raw entry
-        route_entry = columns[0]
-        gateway_entry = columns[1]
+        route_entry, gateway_entry = columns[0], columns[1]
         try:
             if "/" in route_entry:  # CIDR format
                 normalized_entry = normalize_route_entry(module, route_entry)
                 network = ipaddress.ip_network(normalized_entry, strict=False)
-                routing_table.append(network)
-                gateways.append(gateway_entry)
             elif "." in route_entry:  # IP format, assume /32
                 network = ipaddress.ip_network(f"{route_entry}/32", strict=False)
-                routing_table.append(network)
-                gateways.append(gateway_entry)
+            else:
+                continue
         except Exception as e:
             module.warn(f"Invalid route entry skipped: {route_entry}, Error: {str(e)}")
             continue
+        routing_table.append(network)
+        gateways.append(gateway_entry)
 
     return routing_table, gateways
 
@@ -157,6 +157,7 @@ options:
     default: false
 
 notes:
+  - In check mode, the command is built and returned in I(cmd) but it is not run.
   - You can refer to the IBM documentation for additional information on the snap command at
     U(https://www.ibm.com/support/knowledgecenter/ssw_aix_72/c_commands/snap.html).
 '''
@@ -165,22 +166,34 @@ EXAMPLES = r'''
 - name: Collect hardware related data
   ibm.power_aix.snap:
     action: "snap"
-    option: -h
+    hardware_info: true
 
 - name: Clear old snap data
   ibm.power_aix.snap:
     action: "snap"
-    option: -r
+    reset: true
 
 - name: Collect file system data
   ibm.power_aix.snap:
     action: "snap"
-    option: -f
+    file_system_info: true
 
 - name: Collect all system data
   ibm.power_aix.snap:
     action: "snap"
-    option: -a
+    all_info: true
+
+- name: Split a snap file into 2MB pieces
+  ibm.power_aix.snap:
+    action: "snapsplit"
+    ss_filename: "/tmp/ibmsupt/snap.pax.Z"
+    ss_size: "2"
+
+- name: Gather a core file and its program
+  ibm.power_aix.snap:
+    action: "snapcore"
+    sc_core_file: "core"
+    sc_program_name: "coretest"
 '''
 
 RETURN = r'''
@@ -188,17 +201,21 @@ msg:
     description: The execution message.
     returned: always
     type: str
-    sample: 'Snap command executed successfully with option -P'
+    sample: 'Snap command executed successfully with option snap -a'
 rc:
     description: The return code.
     returned: if the command failed.
     type: int
 stdout:
-    description: The standard output.
+    description:
+    - The standard output.
+    - Only the last 64KB of the output are returned.
     returned: if the command failed.
     type: str
 stderr:
-    description: The standard error.
+    description:
+    - The standard error.
+    - Only the last 64KB of the output are returned.
     returned: if the command failed.
     type: str
 
@@ -210,27 +227,67 @@ import shutil
 __metaclass__ = type
 
 
-expectPrompts = {
-    "reset": "/usr/bin/expect -c \"spawn snap -r; \
-            expect \\\"Do you want me to remove these directories \\(y|n\\): \\\"; \
-            send \\\"y\\r\\\"; \
-            expect \\\"Nothing to clean up\\\";\""
-}
+# (parameter, flag) pairs for the independent snap options, in the order
+# the flags are emitted. The general/security/hardware options are
+# mutually dependent and are handled separately in snap_general_option.
+_SNAP_FLAG_MAP = (
+    ('file_system_info', '-f'),
+    ('live_kernel', '-U'),
+    ('installation_info', '-i'),
+    ('kernel_info', '-k'),
+    ('workload_manager_info', '-w'),
+)
+_SNAP_TRAILING_FLAG_MAP = (
+    ('collects_dump', '-D'),
+    ('compress', '-c'),
+)
+
+# snap -a can print several megabytes of progress messages; only the end of
+# the output is useful in the module result.
+_OUTPUT_TAIL_SIZE = 64 * 1024
+
+# Arguments the module accepts
+_ARGSPEC = dict(
+    action=dict(type='str', default='snap', choices=['snap', 'snapcore', 'snapsplit']),
+    all_info=dict(type='bool', default=False),
+    compress=dict(type='bool', default=False),
+    general_info=dict(type='bool', default=False),
+    live_kernel=dict(type='bool', default=False),
+    hacmp=dict(type='bool', default=False),
+    reset=dict(type='bool', default=False),
+    file_system_info=dict(type='bool', default=False),
+    collects_dump=dict(type='bool', default=False),
+    installation_info=dict(type='bool', default=False),
+    kernel_info=dict(type='bool', default=False),
+    security_info=dict(type='bool', default=False),
+    workload_manager_info=dict(type='bool', default=False),
+    hardware_info=dict(type='bool', default=False),
+    ss_filename=dict(type='str'),
+    ss_timestamp=dict(type='str'),
+    ss_machinename=dict(type='str'),
+    ss_size=dict(type='str'),
+    ss_rejoining=dict(type='bool', default=False),
+    sc_output_dir=dict(type='str'),
+    sc_core_file=dict(type='str'),
+    sc_program_name=dict(type='str'),
+    sc_remove_core=dict(type='bool', default=False),
+)
 
 
 def build_snap_command(module):
     """
-    Called the build snap command and check memory greated than 8MB
+    Called the build snap command and check the free space in /tmp is
+    greater than 8MB
     arguments:
      module (AnsibleModule): The Ansible module instance.
     return:
         CMD - command which is succesfully cretaed
 
     """
-    if check_memory_availbilty():
+    if check_disk_availability():
         cmd = snap_general_option(module)
     else:
-        msg = "Memory is less than 8 mb:"
+        msg = "Free space in /tmp is less than 8 MB"
         module.fail_json(msg=msg)
     return cmd
 
@@ -244,55 +301,61 @@ def snap_general_option(module):
     return:
         True - when command succesfully created
     """
+    p = module.params
     cmd = ['snap']
-    if module.params['all_info']:
-        cmd += ['-a']
-    elif module.params['hacmp']:
-        cmd += ['-e']
+    if p['all_info']:
+        cmd.append('-a')
+    elif p['hacmp']:
+        cmd.append('-e')
     else:
-        if module.params['file_system_info']:
-            cmd += ['-f']
-        if module.params['live_kernel']:
-            cmd += ['-U']
-        if module.params['installation_info']:
-            cmd += ['-i']
-        if module.params['kernel_info']:
-            cmd += ['-k']
-        if module.params['workload_manager_info']:
-            cmd += ['-w']
-        if module.params['general_info']:
-            if module.params['security_info']:
-                cmd += ['-S']
-            cmd += ['-g']
-        elif module.params['hardware_info']:
-            cmd += ['-H']
-        if module.params['collects_dump']:
-            cmd += ['-D']
-        if module.params['compress']:
-            cmd += ['-c']
+        cmd.extend(flag for name, flag in _SNAP_FLAG_MAP if p[name])
+        if p['general_info']:
+            if p['security_info']:
+                cmd.append('-S')
+            cmd.append('-g')
+        elif p['hardware_info']:
+            cmd.append('-H')
+        cmd.extend(flag for name, flag in _SNAP_TRAILING_FLAG_MAP if p[name])
     return cmd
 
 
-def check_memory_availbilty():
+def check_disk_availability(path="/tmp"):
     """
-    Check the memory is greater than 8 MB
+    Check the free space of the file system holding the snap data
+    is greater than 8 MB
     arguments:
-      None
+      path (str): A path on the file system to check.
     return:
-        True - If the memory greater than 8 MB
-        False - If the memory less than 8 MB.
+        True - If the free space is greater than 8 MB
+        False - If the free space is less than 8 MB.
     """
 
-    stat = shutil.disk_usage("/")
+    stat = shutil.disk_usage(path)
     free_space_mb = stat.free // (1024 * 1024)
     if free_space_mb < 8:
         return False
     return True
 
 
+def tail_output(output, limit=_OUTPUT_TAIL_SIZE):
+    """
+    Keep only the end of a command output
+    arguments:
+      output (str): The output of the command.
+      limit (int): The maximum number of characters to keep.
+    return:
+        The last limit characters of output, prefixed with a marker line
+        when the output has been truncated.
+    """
+    if len(output) <= limit:
+        return output
+    return "[... output truncated ...]\n" + output[-limit:]
+
+
 def run_snap_command_with_expect(module):
     """
-    Executes the `snap -r` command using an `expect` script to handle interactive prompts.
+    Executes the `snap -r` command, answering its interactive confirmation
+    prompt through standard input.
 
     arguments:
         module (AnsibleModule): The Ansible module instance.
@@ -301,8 +364,8 @@ def run_snap_command_with_expect(module):
         dict: A dictionary containing 'stdout', 'stderr', 'rc', and 'changed'.
     """
     try:
-        cmd = expectPrompts['reset']
-        rc, stdout, stderr = module.run_command(cmd)
+        cmd = ['snap', '-r']
+        rc, stdout, stderr = module.run_command(cmd, data='y')
 
         # Handle the outputs
         if "Nothing to clean up" in stdout:
@@ -349,16 +412,16 @@ def build_snapsplit_command(module):
     cmd = ['snapsplit']
     if module.params['ss_filename']:
         if module.params['ss_size']:
-            cmd += [f" -s {module.params['ss_size']}"]
+            cmd.extend(('-s', module.params['ss_size']))
         if module.params['ss_machinename']:
-            cmd += [f" -H {module.params['ss_machinename']}"]
-        cmd += [f" -f {module.params['ss_filename']}"]
+            cmd.extend(('-H', module.params['ss_machinename']))
+        cmd.extend(('-f', module.params['ss_filename']))
     elif module.params['ss_rejoining']:
-        cmd += ['-u']
+        cmd.append('-u')
         if module.params['ss_timestamp']:
-            cmd += [f" -T {module.params['ss_timestamp']}"]
+            cmd.extend(('-T', module.params['ss_timestamp']))
         if module.params['ss_machinename']:
-            cmd += [f" -H {module.params['ss_machinename']}"]
+            cmd.extend(('-H', module.params['ss_machinename']))
     return cmd
 
 
@@ -372,7 +435,7 @@ def build_snapcore_command(module):
     """
     cmd = ['snapcore']
     if module.params['sc_output_dir']:
-        cmd.append(f"-d {module.params['sc_output_dir']}")
+        cmd.extend(('-d', module.params['sc_output_dir']))
     # Check for the remove option (-r)
     if module.params['sc_remove_core']:
         cmd.append('-r')
@@ -383,35 +446,57 @@ def build_snapcore_command(module):
     return cmd
 
 
+# Command builder of each action
+_ACTIONS = {
+    'snap': build_snap_command,
+    'snapcore': build_snapcore_command,
+    'snapsplit': build_snapsplit_command,
+}
+
+
+def run_and_report(module, cmd, result):
+    """
+    Run the command of the requested action and fill the module result
+    arguments:
+     module (AnsibleModule): The Ansible module instance.
+     cmd (list): The command to run.
+     result (dict): The result of the module, updated in place.
+    """
+    action = module.params['action']
+    rc, stdout, stderr = module.run_command(cmd)
+    stdout = tail_output(stdout)
+    stderr = tail_output(stderr)
+    cmd_str = ' '.join(cmd)
+    result['cmd'] = cmd_str
+    result['rc'] = rc
+    result['stdout'] = stdout
+    result['stderr'] = stderr
+    if rc != 0:
+        msg = f"Unable to run the {action} command: {cmd_str}"
+        module.fail_json(msg=msg, rc=rc, stdout=stdout, stderr=stderr)
+    result['changed'] = True
+    result['msg'] = f"{action.capitalize()} command executed successfully with option {cmd_str}"
+
+
+def exit_check_mode(module, cmd, result):
+    """
+    Exit without running the command when the module runs in check mode
+    arguments:
+     module (AnsibleModule): The Ansible module instance.
+     cmd (list): The command that would be run.
+     result (dict): The result of the module.
+    """
+    cmd_str = ' '.join(cmd)
+    result['cmd'] = cmd_str
+    result['changed'] = True
+    result['msg'] = f"Check mode: the command would be run: {cmd_str}"
+    module.exit_json(**result)
+
+
 def main():
-    # Define the arguments the module accepts
     module = AnsibleModule(
-        argument_spec=dict(
-            action=dict(type='str', default='snap', choices=['snap', 'snapcore', 'snapsplit']),
-            all_info=dict(type='bool', default=False),
-            compress=dict(type='bool', default=False),
-            general_info=dict(type='bool', default=False),
-            live_kernel=dict(type='bool', default=False),
-            hacmp=dict(type='bool', default=False),
-            reset=dict(type='bool', default=False),
-            file_system_info=dict(type='bool', default=False),
-            collects_dump=dict(type='bool', default=False),
-            installation_info=dict(type='bool', default=False),
-            kernel_info=dict(type='bool', default=False),
-            security_info=dict(type='bool', default=False),
-            workload_manager_info=dict(type='bool', default=False),
-            hardware_info=dict(type='bool', default=False),
-            ss_filename=dict(type='str'),
-            ss_timestamp=dict(type='str'),
-            ss_machinename=dict(type='str'),
-            ss_size=dict(type='str'),
-            ss_rejoining=dict(type='bool', default=False),
-            sc_output_dir=dict(type='str'),
-            sc_core_file=dict(type='str'),
-            sc_program_name=dict(type='str'),
-            sc_remove_core=dict(type='bool', default=False),
-        ),
-        supports_check_mode=False
+        argument_spec=_ARGSPEC,
+        supports_check_mode=True
     )
 
     result = dict(
@@ -422,49 +507,15 @@ def main():
         stderr='',
     )
     action = module.params['action']
-    if action == 'snap':
-        if module.params['reset']:
-            result = run_snap_command_with_expect(module)
-        else:
-            cmd = build_snap_command(module)
-            rc, stdout, stderr = module.run_command(cmd)
-            result['cmd'] = ' '.join(cmd)
-            result['rc'] = rc
-            result['stdout'] = stdout
-            result['stderr'] = stderr
-            if rc != 0:
-                msg = f"Unable to run the snap command: {cmd}"
-                module.fail_json(msg=msg, rc=rc, stdout=stdout, stderr=stderr)
-            else:
-                result['changed'] = True
-                result['msg'] = f"Snap command executed successfully with option {cmd}"
-
-    elif action == 'snapsplit':
-        cmd = build_snapsplit_command(module)
-        rc, stdout, stderr = module.run_command(cmd)
-        result['cmd'] = ' '.join(cmd)
-        result['rc'] = rc
-        result['stdout'] = stdout
-        result['stderr'] = stderr
-        if rc != 0:
-            msg = f"Unable to run the snapsplit command: {cmd}"
-            module.fail_json(msg=msg, rc=rc, stdout=stdout, stderr=stderr)
-        else:
-            result['changed'] = True
-            result['msg'] = f"Snapsplit command executed successfully with option {cmd}"
-    elif action == 'snapcore':
-        cmd = build_snapcore_command(module)
-        rc, stdout, stderr = module.run_command(cmd)
-        result['cmd'] = ' '.join(cmd)
-        result['rc'] = rc
-        result['stdout'] = stdout
-        result['stderr'] = stderr
-        if rc != 0:
-            msg = f"Unable to run the snapcore command: {cmd}"
-            module.fail_json(msg=msg, rc=rc, stdout=stdout, stderr=stderr)
-        else:
-            result['changed'] = True
-            result['msg'] = f"Snapcore command executed successfully with option {cmd}"
+    if action == 'snap' and module.params['reset']:
+        if module.check_mode:
+            exit_check_mode(module, ['snap', '-r'], result)
+        result = run_snap_command_with_expect(module)
+    else:
+        cmd = _ACTIONS[action](module)
+        if module.check_mode:
+            exit_check_mode(module, cmd, result)
+        run_and_report(module, cmd, result)
     module.exit_json(**result)
 
 
@@ -99,6 +99,7 @@ options:
     - Can be used if I(action=download) or I(action=preview).
     - If I(oslevel) is a TL and I(last_sp=yes) the task is saved with the last SP available at the
       time the task is saved.
+    - When I(action=download), the download is run directly without a preceding preview.
     type: bool
     default: no
   description:
@@ -113,6 +114,9 @@ options:
     - Specifies the directory where metadata files are downloaded.
     - Can be used if I(action=download) or I(action=preview) when I(last_sp=yes) or I(oslevel) is
       not exact, for example I(oslevel=Latest).
+    - Metadata files of the requested TL downloaded by a successful metadata request less than
+      6 hours ago are reused instead of running a new metadata request. Remove them to force a
+      new request.
     type: path
     default: /var/adm/ansible/metadata
 notes:
@@ -207,8 +211,9 @@ meta:
 
 import os
 import re
-import glob
-import shutil
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 
 from ansible.module_utils.basic import AnsibleModule
 __metaclass__ = type
@@ -218,6 +223,30 @@ module = None
 results = None
 suma_params = {}
 
+# Note: module.debug() only logs when ANSIBLE_DEBUG is set; the calls on the
+# metadata and output parsing paths are guarded by module._debug so their
+# messages (which may embed a whole suma output) are not built otherwise.
+
+# environment used for every command so that their output can be parsed
+_C_ENV = dict(LANG='C', LC_ALL='C', LC_MESSAGES='C', LC_CTYPE='C')
+
+# metadata files downloaded less than 6 hours ago are reused
+_METADATA_CACHE_TIME = 6 * 60 * 60
+
+# oslevel formats
+_RE_TL_LAST_SP = re.compile(r"^([0-9]{4}-[0-9]{2})$")
+_RE_TL = re.compile(r"^([0-9]{4}-[0-9]{2})(|-00|-00-0000)$")
+_RE_SP = re.compile(r"^([0-9]{4}-[0-9]{2}-[0-9]{2})(|-[0-9]{4})$")
+_RE_SP_FULL = re.compile(r"^[0-9]{4}-[0-9]{2}-[0-9]{2}-[0-9]{4}$")
+_RE_OSLEVEL = re.compile(r"^[0-9]{4}-[0-9]{2}(|-[0-9]{2}|-[0-9]{2}-[0-9]{4})$")
+# crontab like schedule: minute hour day month weekday, each one can be '*'
+# (leading zeros are allowed as in '007 * * * *', a trailing newline is not)
+_RE_SCHED = re.compile(r"^(\*|0*[0-5]?[0-9]) (\*|0*(?:[01]?[0-9]|2[0-3])) (\*|0*(?:[1-9]|[12][0-9]|3[01]))"
+                       r" (\*|0*(?:[1-9]|1[0-2])) (\*|0*[0-6])\Z")
+# summary lines of the suma preview and download outputs
+_RE_SUMMARY = re.compile(r"^[ \t]+(\d+)[ \t]+(downloaded|failed|skipped)\s*?$", re.MULTILINE)
+_SUMMARY_TAIL_SIZE = 4096
+
 
 def compute_rq_type(oslevel, last_sp):
     """
@@ -226,27 +255,45 @@ def compute_rq_type(oslevel, last_sp):
         oslevel level of the OS
         last_sp boolean specifying if we should get the last SP
     return:
-        Latest when oslevel is blank or latest (not case sensitive)
-        SP     when oslevel is a TL (6 digits: xxxx-xx) and last_sp==True
-        TL     when oslevel is xxxx-xx(-00-0000)
-        SP     when oslevel is xxxx-xx-xx(-xxxx)
-        ERROR  when oslevel is not recognized
+        (rq_type, rq_shape) with rq_type:
+            Latest when oslevel is blank or latest (not case sensitive)
+            SP     when oslevel is a TL (6 digits: xxxx-xx) and last_sp==True
+            TL     when oslevel is xxxx-xx(-00-0000)
+            SP     when oslevel is xxxx-xx-xx(-xxxx)
+            ERROR  when oslevel is not recognized
+        and rq_shape the format of oslevel:
+            latest, tl, sp_short (xxxx-xx-xx), sp_full (xxxx-xx-xx-xxxx)
+            or None when oslevel is not recognized
     """
 
     if oslevel is None or not oslevel.strip() or oslevel == 'Latest':
-        return 'Latest'
-    if re.match(r"^([0-9]{4}-[0-9]{2})$", oslevel) and last_sp:
-        return 'SP'
-    if re.match(r"^([0-9]{4}-[0-9]{2})(|-00|-00-0000)$", oslevel):
+        return 'Latest', 'latest'
+    if _RE_TL_LAST_SP.match(oslevel) and last_sp:
+        return 'SP', 'tl'
+    if _RE_TL.match(oslevel):
         if last_sp:
             msg = f"Parameter last_sp={last_sp} is ignored when oslevel is a TL {oslevel}."
             module.log(msg)
             results['meta']['messages'].append(msg)
-        return 'TL'
-    if re.match(r"^([0-9]{4}-[0-9]{2}-[0-9]{2})(|-[0-9]{4})$", oslevel):
-        return 'SP'
+        return 'TL', 'tl'
+    matched = _RE_SP.match(oslevel)
+    if matched:
+        return 'SP', 'sp_full' if matched.group(2) else 'sp_short'
+
+    return 'ERROR', None
 
-    return 'ERROR'
+
+def is_zero_tl(oslevel):
+    """
+    Check whether oslevel is a release without Technical Level,
+    that is xxxx, xxxx-00, xxxx-00-00 or xxxx-00-00-0000.
+    arguments:
+        oslevel level of the OS
+    return:
+        True when oslevel has a 0 Technical Level
+    """
+    return len(oslevel) >= 4 and oslevel[:4].isdigit() \
+        and oslevel[4:] in ('', '-00', '-00-00', '-00-00-0000')
 
 
 def find_sp_version(file):
@@ -258,25 +305,49 @@ def find_sp_version(file):
        sp_version   value found or None
     """
     sp_version = ""
-    module.debug(f"opening file: {file}")
-    with open(file, mode="r", encoding="utf-8") as myfile:
-        for line in myfile:
-            # module.debug("line: {0}".format(line.rstrip()))
-            match_item = re.match(
-                r"^<SP name=\"([0-9]{4}-[0-9]{2}-[0-9]{2}-[0-9]{4})\">$",
-                line.rstrip())
-            if match_item:
-                version = match_item.group(1)
-                debug_line = line.rstrip()
-                module.debug(f"matched line: {debug_line}, version={version}")
-                if sp_version == "" or version > sp_version:
+    if module._debug:
+        module.debug(f"opening file: {file}")
+    with open(file, mode="rb") as myfile:
+        try:
+            # stop at the first SP element, no need to parse the whole file
+            for event, elem in ET.iterparse(myfile, events=('start',)):
+                if elem.tag != 'SP' and not elem.tag.endswith('}SP'):
+                    continue
+                version = elem.get('name', '')
+                if _RE_SP_FULL.match(version):
+                    if module._debug:
+                        module.debug(f"matched SP element in {file}, version={version}")
                     sp_version = version
-                break
+                    break
+        except ET.ParseError as exc:
+            module.log(f"Cannot parse metadata file {file}: {exc}")
 
     return sp_version
 
 
-def compute_rq_name(rq_type, oslevel, last_sp):
+def metadata_files(ppc_dir, filter_ml, max_age=None):
+    """
+    List the metadata files of a Technical Level.
+    arguments:
+        ppc_dir     directory of the installp metadata files
+        filter_ml   Technical Level of the files, in the form xxxx-xx
+        max_age     if set, maximum age in seconds of the files
+    return:
+       list of the file paths, empty if one of them is older than max_age
+    """
+    if not os.path.isdir(ppc_dir):
+        return []
+    with os.scandir(ppc_dir) as entries:
+        entries = [e for e in entries
+                   if e.name.startswith(filter_ml) and e.name.endswith('.xml') and e.is_file()]
+    if max_age is not None:
+        now = time.time()
+        if any(now - e.stat().st_mtime > max_age for e in entries):
+            return []
+    return [e.path for e in entries]
+
+
+def compute_rq_name(rq_type, rq_shape, oslevel, last_sp):
     """
     Compute rq_name.
         if oslevel is a TL then return the SP extratced from it
@@ -290,6 +361,7 @@ def compute_rq_name(rq_type, oslevel, last_sp):
 
     arguments:
         rq_type     type of request, can be Latest, SP or TL
+        rq_shape    format of oslevel, as computed by compute_rq_type
         oslevel     requested oslevel
         last_sp     if set get the latest SP level for specified oslevel
     note:
@@ -303,10 +375,9 @@ def compute_rq_name(rq_type, oslevel, last_sp):
         return None
 
     if rq_type == 'TL':
-        rq_name = re.match(r"^([0-9]{4}-[0-9]{2})(|-00|-00-0000)$",
-                           oslevel).group(1)
+        rq_name = oslevel[:7]
 
-    elif rq_type == 'SP' and re.match(r"^[0-9]{4}-[0-9]{2}-[0-9]{2}-[0-9]{4}$", oslevel):
+    elif rq_shape == 'sp_full':
         rq_name = oslevel
 
     else:
@@ -320,46 +391,77 @@ def compute_rq_name(rq_type, oslevel, last_sp):
             results['msg'] = msg
             module.fail_json(**results)
 
-        if not os.path.exists(suma_params['metadata_dir']):
-            os.makedirs(suma_params['metadata_dir'])
+        ppc_dir = os.path.join(suma_params['metadata_dir'], 'installp', 'ppc')
+        sp_file = os.path.join(ppc_dir, oslevel + '.xml')
 
-        DLTarget = suma_params['metadata_dir']
-        DisplayName = suma_params['description']
-        FilterDir = suma_params['metadata_dir']
+        # marker touched once a metadata request completed successfully
+        done_file = os.path.join(ppc_dir, metadata_filter_ml + '.done')
 
-        cmd = ['/usr/sbin/suma', '-x', '-a', 'Action=Metadata', '-a', 'RqType=Latest']
-        cmd += ['-a', f'DLTarget={DLTarget}']
-        cmd += ['-a', f'FilterML={metadata_filter_ml}']
-        cmd += ['-a', f'DisplayName="{DisplayName}"']
-        cmd += ['-a', f'FilterDir={FilterDir}']
-
-        rc, stdout, stderr = module.run_command(cmd)
-        if rc != 0:
-            msg_cmd = ' '.join(cmd)
-            msg = f"Suma metadata command '{msg_cmd}' failed with return code {rc}"
-            module.log(msg + f", stderr: {stderr}, stdout:{stdout}".format(stderr, stdout))
-            results['cmd'] = ' '.join(cmd)
-            results['stdout'] = stdout
-            results['stderr'] = stderr
-            results['msg'] = msg
-            module.fail_json(**results)
-        debug_cmd = ' '.join(cmd)
-        module.debug(f"SUMA command '{debug_cmd}' rc:{rc}, stdout:{stdout}")
+        # reuse the metadata files of a recent request for the same TL
+        files = []
+        if os.path.isfile(done_file) and time.time() - os.stat(done_file).st_mtime <= _METADATA_CACHE_TIME:
+            files = metadata_files(ppc_dir, metadata_filter_ml, _METADATA_CACHE_TIME)
+        if rq_shape == 'sp_short' and sp_file not in files:
+            files = []
+        if files:
+            msg = f"Suma metadata: reusing the metadata files of {metadata_filter_ml} from {ppc_dir}"
+            module.log(msg)
+            results['meta']['messages'].append(msg)
+        else:
+            if not os.path.exists(suma_params['metadata_dir']):
+                os.makedirs(suma_params['metadata_dir'])
+            # remove outdated files of the TL so only fresh ones are parsed
+            if os.path.isfile(done_file):
+                os.unlink(done_file)
+            for file in metadata_files(ppc_dir, metadata_filter_ml):
+                os.unlink(file)
+
+            DLTarget = suma_params['metadata_dir']
+            DisplayName = suma_params['description']
+            FilterDir = suma_params['metadata_dir']
+
+            cmd = ['/usr/sbin/suma', '-x', '-a', 'Action=Metadata', '-a', 'RqType=Latest']
+            cmd += ['-a', f'DLTarget={DLTarget}']
+            cmd += ['-a', f'FilterML={metadata_filter_ml}']
+            cmd += ['-a', f'DisplayName="{DisplayName}"']
+            cmd += ['-a', f'FilterDir={FilterDir}']
+
+            rc, stdout, stderr = module.run_command(cmd)
+            if rc != 0:
+                # do not leave partial files that a later run could reuse
+                for file in metadata_files(ppc_dir, metadata_filter_ml):
+                    os.unlink(file)
+                msg_cmd = ' '.join(cmd)
+                msg = f"Suma metadata command '{msg_cmd}' failed with return code {rc}"
+                module.log(msg + f", stderr: {stderr}, stdout:{stdout}")
+                results['cmd'] = ' '.join(cmd)
+                results['stdout'] = stdout
+                results['stderr'] = stderr
+                results['msg'] = msg
+                module.fail_json(**results)
+            if module._debug:
+                debug_cmd = ' '.join(cmd)
+                module.debug(f"SUMA command '{debug_cmd}' rc:{rc}, stdout:{stdout}")
+
+            files = metadata_files(ppc_dir, metadata_filter_ml)
+            if files:
+                with open(done_file, 'w'):
+                    pass
 
         sp_version = ""
-        if len(oslevel) == 10:
+        if rq_shape == 'sp_short':
             # find latest SP build number for the SP
-            file_name = suma_params['metadata_dir'] + "/installp/ppc/" + oslevel + ".xml"
-            sp_version = find_sp_version(file_name)
+            if sp_file in files:
+                sp_version = find_sp_version(sp_file)
         else:
             # find latest SP build number for the TL
-            file_name = suma_params['metadata_dir'] + "/installp/ppc/" + "*.xml"
-            files = glob.glob(file_name)
-            module.debug(f"searching SP in files: {files}")
-            for cur_file in files:
-                version = find_sp_version(cur_file)
-                if sp_version == "" or version > sp_version:
-                    sp_version = version
+            if module._debug:
+                module.debug(f"searching SP in files: {files}")
+            if files:
+                # metadata files are independent, parse them concurrently
+                with ThreadPoolExecutor(max_workers=min(8, len(files))) as executor:
+                    sp_version = max((v for v in executor.map(find_sp_version, files) if v),
+                                     default="")
 
         if sp_version is None or not sp_version.strip():
             msg = f"Cannot determine SP version for OS level {oslevel}: \
@@ -368,8 +470,6 @@ def compute_rq_name(rq_type, oslevel, last_sp):
             results['msg'] = msg
             module.fail_json(**results)
 
-        shutil.rmtree(suma_params['metadata_dir'])
-
         rq_name = sp_version
         msg = f'Suma metadata: {rq_name} is the latest SP of {oslevel}'
         module.log(msg)
@@ -438,6 +538,27 @@ def suma_command(action):
     return stdout
 
 
+def parse_suma_summary(stdout):
+    """
+    Parse the summary of a suma preview or download output.
+
+    arguments:
+        stdout  suma command output
+    return:
+       (downloaded, failed, skipped) numbers of fixes
+    """
+    # The summary is printed at the end of the output: look in its tail
+    # first, the whole output is only scanned if a count is missing there.
+    for pos in (max(0, len(stdout) - _SUMMARY_TAIL_SIZE), 0):
+        counts = {}
+        for matched in _RE_SUMMARY.finditer(stdout, pos):
+            counts[matched.group(2)] = int(matched.group(1))
+        if len(counts) == 3 or pos == 0:
+            break
+
+    return counts.get('downloaded', 0), counts.get('failed', 0), counts.get('skipped', 0)
+
+
 def suma_list():
     """
     List all SUMA tasks or the task associated with the given task ID
@@ -496,25 +617,20 @@ def suma_edit():
         Exits with fail_json in case of error
     """
 
-    cmd = '/usr/sbin/suma'
+    cmd = ['/usr/sbin/suma']
     sched_time = suma_params['sched_time']
     if suma_params['sched_time'] is None:
         # save
-        cmd += ' -w'
+        cmd += ['-w']
 
     elif not suma_params['sched_time'].strip():
         # unschedule
-        cmd += ' -u'
+        cmd += ['-u']
 
     else:
         # schedule
-        minute, hour, day, month, weekday = suma_params['sched_time'].split(' ')
-
-        if check_time(minute, 0, 59) and check_time(hour, 0, 23) \
-           and check_time(day, 1, 31) and check_time(month, 1, 12) \
-           and check_time(weekday, 0, 6):
-
-            cmd += f' -s "{sched_time}"'
+        if _RE_SCHED.match(sched_time):
+            cmd += ['-s', sched_time]
         else:
             info_cmd = ' '.join(cmd)
             msg = f"Suma edit command '{info_cmd}' failed: Bad schedule time '{sched_time}'"
@@ -522,16 +638,16 @@ def suma_edit():
             results['msg'] = msg
             module.fail_json(**results)
 
-    task_id = suma_params['task_id']
-    cmd += f' {task_id}'
+    cmd += [suma_params['task_id']]
     rc, stdout, stderr = module.run_command(cmd)
 
-    results['cmd'] = cmd
+    results['cmd'] = ' '.join(cmd)
     results['stdout'] = stdout
     results['stderr'] = stderr
 
     if rc != 0:
-        msg = f"Suma edit command '{cmd}' failed with return code {rc}"
+        info_cmd = results['cmd']
+        msg = f"Suma edit command '{info_cmd}' failed with return code {rc}"
         module.log(msg + f", stderr: {stderr}, stdout:{stdout}")
         results['msg'] = msg
         module.fail_json(**results)
@@ -545,16 +661,16 @@ def suma_unschedule():
         Exits with fail_json in case of error
     """
 
-    task_id = suma_params['task_id']
-    cmd = f"/usr/sbin/suma -u {task_id}"
+    cmd = ['/usr/sbin/suma', '-u', suma_params['task_id']]
     rc, stdout, stderr = module.run_command(cmd)
 
-    results['cmd'] = cmd
+    results['cmd'] = ' '.join(cmd)
     results['stdout'] = stdout
     results['stderr'] = stderr
 
     if rc != 0:
-        msg = f"Suma unschedule command '{cmd}' failed with return code {rc}"
+        info_cmd = results['cmd']
+        msg = f"Suma unschedule command '{info_cmd}' failed with return code {rc}"
         module.log(msg + f", stderr: {stderr}, stdout:{stdout}")
         results['msg'] = msg
         module.fail_json(**results)
@@ -568,16 +684,16 @@ def suma_delete():
         Exits with fail_json in case of error
     """
 
-    task_id = suma_params['task_id']
-    cmd = f"/usr/sbin/suma -d {task_id}"
+    cmd = ['/usr/sbin/suma', '-d', suma_params['task_id']]
     rc, stdout, stderr = module.run_command(cmd)
 
-    results['cmd'] = cmd
+    results['cmd'] = ' '.join(cmd)
     results['stdout'] = stdout
     results['stderr'] = stderr
 
     if rc != 0:
-        msg = f"Suma delete command '{cmd}' failed with return code {rc}"
+        info_cmd = results['cmd']
+        msg = f"Suma delete command '{info_cmd}' failed with return code {rc}"
         module.log(msg + f", stderr: {stderr}, stdout:{stdout}")
         results['msg'] = msg
         module.fail_json(**results)
@@ -591,16 +707,16 @@ def suma_run():
         Exits with fail_json in case of error
     """
 
-    task_id = suma_params['task_id']
-    cmd = f"/usr/sbin/suma -x {task_id}"
+    cmd = ['/usr/sbin/suma', '-x', suma_params['task_id']]
     rc, stdout, stderr = module.run_command(cmd)
 
-    results['cmd'] = cmd
+    results['cmd'] = ' '.join(cmd)
     results['stdout'] = stdout
     results['stderr'] = stderr
 
     if rc != 0:
-        msg = f"Suma run command '{cmd}' failed with return code {rc}"
+        info_cmd = results['cmd']
+        msg = f"Suma run command '{info_cmd}' failed with return code {rc}"
         module.log(msg + f", stderr: {stderr}, stdout:{stdout}")
         results['msg'] = msg
         module.fail_json(**results)
@@ -614,15 +730,16 @@ def suma_config():
         Exits with fail_json in case of error
     """
 
-    cmd = '/usr/sbin/suma -c'
+    cmd = ['/usr/sbin/suma', '-c']
     rc, stdout, stderr = module.run_command(cmd)
 
-    results['cmd'] = cmd
+    results['cmd'] = ' '.join(cmd)
     results['stdout'] = stdout
     results['stderr'] = stderr
 
     if rc != 0:
-        msg = f"Suma config command '{cmd}' failed with return code {rc}"
+        info_cmd = results['cmd']
+        msg = f"Suma config command '{info_cmd}' failed with return code {rc}"
         module.log(msg + f", stderr: {stderr}, stdout:{stdout}")
         results['msg'] = msg
         module.fail_json(**results)
@@ -636,15 +753,16 @@ def suma_default():
         Exits with fail_json in case of error
     """
 
-    cmd = '/usr/sbin/suma -D'
+    cmd = ['/usr/sbin/suma', '-D']
     rc, stdout, stderr = module.run_command(cmd)
 
-    results['cmd'] = cmd
+    results['cmd'] = ' '.join(cmd)
     results['stdout'] = stdout
     results['stderr'] = stderr
 
     if rc != 0:
-        msg = f"Suma list default command '{cmd}' failed with return code {rc}"
+        info_cmd = results['cmd']
+        msg = f"Suma list default command '{info_cmd}' failed with return code {rc}"
         module.log(msg + f", stderr: {stderr}, stdout:{stdout}")
         results['msg'] = msg
         module.fail_json(**results)
@@ -669,15 +787,14 @@ def suma_download():
     if not suma_params['oslevel'].strip() or suma_params['oslevel'].upper() == 'LATEST':
         suma_params['oslevel'] = 'Latest'
     else:
-        if re.match(r"^[0-9]{4}(|-00|-00-00|-00-00-0000)$", suma_params['oslevel']):
+        if is_zero_tl(suma_params['oslevel']):
             msg_oslevel = suma_params['oslevel']
             msg = f"Bad parameter: oslevel is '{msg_oslevel}', \
                 specify a non 0 value for the Technical Level or the Service Pack"
             module.log(msg)
             results['msg'] = msg
             module.fail_json(**results)
-        elif not re.match(r"^[0-9]{4}-[0-9]{2}(|-[0-9]{2}|-[0-9]{2}-[0-9]{4})$",
-                          suma_params['oslevel']):
+        elif not _RE_OSLEVEL.match(suma_params['oslevel']):
             msg_oslevel = suma_params['oslevel']
             msg = f"Bad parameter: oslevel is '{msg_oslevel}', \
                 should repect the format: xxxx-xx or xxxx-xx-xx or xxxx-xx-xx-xxxx"
@@ -688,7 +805,7 @@ def suma_download():
     # =========================================================================
     # compute SUMA request type based on oslevel property
     # =========================================================================
-    rq_type = compute_rq_type(suma_params['oslevel'], suma_params['last_sp'])
+    rq_type, rq_shape = compute_rq_type(suma_params['oslevel'], suma_params['last_sp'])
     if rq_type == 'ERROR':
         msg_oslevel = suma_params['oslevel']
         msg = f"Bad parameter: oslevel is '{msg_oslevel}', parsing error"
@@ -697,12 +814,14 @@ def suma_download():
         module.fail_json(**results)
 
     suma_params['RqType'] = rq_type
+    suma_params['RqShape'] = rq_shape
     module.debug(f"SUMA req Type: {rq_type}")
 
     # =========================================================================
     # compute SUMA request name based on metadata info
     # =========================================================================
-    suma_params['RqName'] = compute_rq_name(rq_type, suma_params['oslevel'], suma_params['last_sp'])
+    suma_params['RqName'] = compute_rq_name(rq_type, rq_shape, suma_params['oslevel'],
+                                            suma_params['last_sp'])
     debug_rqname = suma_params['RqName']
     module.debug(f"Suma req Name: {debug_rqname}")
 
@@ -724,67 +843,45 @@ def suma_download():
     if not os.path.exists(suma_params['DLTarget']):
         os.makedirs(suma_params['DLTarget'])
 
+    # The download output reports the same summary as the preview, so a
+    # download saved as a task does not need a separate preview run.
+    preview_first = suma_params['action'] == 'preview' or not suma_params['save_task']
+    downloaded = 0
+
     # ========================================================================
     # SUMA command for preview
     # ========================================================================
-    stdout = suma_command('Preview')
-    module.debug(f"SUMA preview stdout:{stdout}")
+    if preview_first:
+        stdout = suma_command('Preview')
+        if module._debug:
+            module.debug(f"SUMA preview stdout:{stdout}")
 
-    # parse output to see if there is something to download
-    downloaded = 0
-    failed = 0
-    skipped = 0
-    for line in stdout.rstrip().splitlines():
-        line = line.rstrip()
-        matched = re.match(r"^\s+(\d+)\s+downloaded$", line)
-        if matched:
-            downloaded = int(matched.group(1))
-            continue
-        matched = re.match(r"^\s+(\d+)\s+failed$", line)
-        if matched:
-            failed = int(matched.group(1))
-            continue
-        matched = re.match(r"^\s+(\d+)\s+skipped$", line)
-        if matched:
-            skipped = int(matched.group(1))
-
-    msg = f"Preview summary : {downloaded} to download, {failed} failed, {skipped} skipped"
-    module.log(msg)
-
-    # If action is preview or nothing is available to download, we are done
-    if suma_params['action'] == 'preview':
+        # parse output to see if there is something to download
+        downloaded, failed, skipped = parse_suma_summary(stdout)
+
+        msg = f"Preview summary : {downloaded} to download, {failed} failed, {skipped} skipped"
+        module.log(msg)
+
+        # If action is preview or nothing is available to download, we are done
+        if suma_params['action'] == 'preview':
+            results['meta']['messages'].append(msg)
+            return
+        if downloaded == 0 and skipped == 0:
+            return
+        # else continue
+        results['meta']['messages'].extend(stdout.rstrip().splitlines())
         results['meta']['messages'].append(msg)
-        return
-    if downloaded == 0 and skipped == 0:
-        return
-    # else continue
-    results['meta']['messages'].extend(stdout.rstrip().splitlines())
-    results['meta']['messages'].append(msg)
 
     # ================================================================
     # SUMA command for download
     # ================================================================
-    if downloaded != 0:
+    if not preview_first or downloaded != 0:
         stdout = suma_command('Download')
-        module.debug(f"SUMA dowload stdout:{stdout}")
+        if module._debug:
+            module.debug(f"SUMA dowload stdout:{stdout}")
 
         # parse output to see if something has been downloaded
-        downloaded = 0
-        failed = 0
-        skipped = 0
-        for line in stdout.rstrip().splitlines():
-            line = line.rstrip()
-            matched = re.match(r"^\s+(\d+)\s+downloaded$", line)
-            if matched:
-                downloaded = int(matched.group(1))
-                continue
-            matched = re.match(r"^\s+(\d+)\s+failed$", line)
-            if matched:
-                failed = int(matched.group(1))
-                continue
-            matched = re.match(r"^\s+(\d+)\s+skipped$", line)
-            if matched:
-                skipped = int(matched.group(1))
+        downloaded, failed, skipped = parse_suma_summary(stdout)
 
         msg = f"Download summary : {downloaded} downloaded, {failed} failed, {skipped} skipped"
         if downloaded == 0 and skipped == 0:
@@ -804,21 +901,21 @@ def suma_download():
     # Install updates
     # ===========================================================
     if not suma_params['download_only']:
-        cmd_DLTarget = suma_params['DLTarget']
-        cmd = f"/usr/sbin/install_all_updates -Yd {cmd_DLTarget}"
+        cmd = ['/usr/sbin/install_all_updates', '-Yd', suma_params['DLTarget']]
+        info_cmd = ' '.join(cmd)
 
-        module.debug(f"SUMA command:{cmd}")
+        module.debug(f"SUMA command:{info_cmd}")
         results['meta']['messages'].append(msg)
 
         rc, stdout, stderr = module.run_command(cmd)
 
-        results['cmd'] = cmd
+        results['cmd'] = info_cmd
         results['stdout'] = stdout
         results['stderr'] = stderr
         results['changed'] = True
 
         if rc != 0:
-            msg = f"Suma install command '{cmd}' failed with return code {rc}."
+            msg = f"Suma install command '{info_cmd}' failed with return code {rc}."
             module.log(msg + f", stderr:{stderr}, stdout:{stdout}")
             results['msg'] = msg
             module.fail_json(**results)
@@ -828,6 +925,53 @@ def suma_download():
 
 ##############################################################################
 
+def set_task_params():
+    """
+    Copy the task parameters used by the list, unschedule, delete and run
+    actions into suma_params.
+    """
+    suma_params['task_id'] = module.params['task_id']
+
+
+def set_edit_params():
+    """
+    Copy the task parameters used by the edit action into suma_params.
+    """
+    set_task_params()
+    suma_params['sched_time'] = module.params['sched_time']
+
+
+def set_download_params():
+    """
+    Copy the parameters used by the download and preview actions into
+    suma_params.
+    """
+    params = module.params
+    action = params['action']
+    for key in ('oslevel', 'download_dir', 'metadata_dir', 'download_only',
+                'save_task', 'last_sp', 'extend_fs'):
+        suma_params[key] = params[key]
+    if params['description']:
+        suma_params['description'] = params['description']
+    else:
+        suma_params['description'] = f"{action} request for oslevel {params['oslevel']}"
+    suma_params['action'] = action
+
+
+# action -> (parameter setter, action function)
+_ACTIONS = {
+    'list': (set_task_params, suma_list),
+    'edit': (set_edit_params, suma_edit),
+    'unschedule': (set_task_params, suma_unschedule),
+    'delete': (set_task_params, suma_delete),
+    'run': (set_task_params, suma_run),
+    'config': (None, suma_config),
+    'default': (None, suma_default),
+    'download': (set_download_params, suma_download),
+    'preview': (set_download_params, suma_download),
+}
+
+
 def main():
     global module
     global results
@@ -868,59 +1012,20 @@ def main():
         meta={'messages': []},
     )
 
-    module.debug('*** START ***')
-    module.run_command_environ_update = dict(LANG='C', LC_ALL='C', LC_MESSAGES='C', LC_CTYPE='C')
+    module.run_command_environ_update = _C_ENV
 
     action = module.params['action']
-    oslevel = module.params['oslevel']
 
     # switch action
-    if action == 'list':
-        suma_params['task_id'] = module.params['task_id']
-        suma_list()
-
-    elif action == 'edit':
-        suma_params['task_id'] = module.params['task_id']
-        suma_params['sched_time'] = module.params['sched_time']
-        suma_edit()
-
-    elif action == 'unschedule':
-        suma_params['task_id'] = module.params['task_id']
-        suma_unschedule()
-
-    elif action == 'delete':
-        suma_params['task_id'] = module.params['task_id']
-        suma_delete()
-
-    elif action == 'run':
-        suma_params['task_id'] = module.params['task_id']
-        suma_run()
-
-    elif action == 'config':
-        suma_config()
-
-    elif action == 'default':
-        suma_default()
-
-    elif action == 'download' or action == 'preview':
-        suma_params['oslevel'] = module.params['oslevel']
-        suma_params['download_dir'] = module.params['download_dir']
-        suma_params['metadata_dir'] = module.params['metadata_dir']
-        suma_params['download_only'] = module.params['download_only']
-        suma_params['save_task'] = module.params['save_task']
-        suma_params['last_sp'] = module.params['last_sp']
-        suma_params['extend_fs'] = module.params['extend_fs']
-        if module.params['description']:
-            suma_params['description'] = module.params['description']
-        else:
-            suma_params['description'] = f"{action} request for oslevel {oslevel}"
-
-        suma_params['action'] = action
-        suma_download()
+    set_params, run_action = _ACTIONS[action]
+    if set_params is not None:
+        set_params()
+    run_action()
 
     # Exit
     msg = f'Suma {action} completed successfully'
-    module.log(msg)
+    if module._debug:
+        module.log(msg)
     results['msg'] = msg
     module.exit_json(**results)
 
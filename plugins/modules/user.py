@@ -123,85 +123,95 @@ stderr:
 '''
 
 
-import re
 from ansible.module_utils.basic import AnsibleModule
 __metaclass__ = type
 
+# boolean-like attribute values, compared in lower case
+_BOOLISH = frozenset(('yes', 'true', 'always', 'no', 'false', 'never'))
 
-def get_chuser_command(module):
+# lsuser results for the current module run, keyed by (name, load_module)
+_LSUSER_CACHE = {}
+
+
+def run_lsuser(module):
     '''
-    Returns the 'cmd' needed to run to implement changes on
+    Runs lsuser -C for the user, reusing the result of a previous call
+    for the same user and load module.
+
     arguments:
         module  (dict): The Ansible module
-    note:
-        Exits with fail_json in case of error
     return:
-        cmd string, or None if no changes are necessary.
+        (rc, stdout, stderr) of the lsuser command
+    '''
+    params = module.params
+    key = (params['name'], params['load_module'])
+    if key not in _LSUSER_CACHE:
+        cmd = ['lsuser', '-R', key[1], '-C', key[0]]
+        _LSUSER_CACHE[key] = module.run_command(cmd)
+    return _LSUSER_CACHE[key]
+
+
+def invalidate_lsuser(module):
+    '''
+    Drops the cached lsuser result once the user has been changed.
+    '''
+    _LSUSER_CACHE.pop((module.params['name'], module.params['load_module']), None)
+
+
+def get_chuser_command(module, user_attrs):
+    '''
+    Returns the 'cmd' needed to run to implement changes on
+    arguments:
+        module      (dict): The Ansible module
+        user_attrs  (dict): Current user attributes, as returned by get_user_attrs
+    return:
+        cmd argument list, or None if no changes are necessary.
     '''
     # 'attributes' contains all of the key=value pairs that Ansible wants us to set
-    attributes = module.params['attributes']
-    load_module = module.params['load_module']
-    name = module.params['name']
+    params = module.params
+    attributes = params['attributes']
+    load_module = params['load_module']
+    name = params['name']
     if attributes is None:
         # No attributes to change, return None before we do anything.
         return None
 
     # 'user_attrs' contains the key=value pairs that are _currently_ set in AIX
-    lsuser_cmd = f"lsuser -R {load_module} -C {name}"
-    rc, stdout, stderr = module.run_command(lsuser_cmd)
-    if rc != 0:
-        msg = f"\nFailed to validate attributes for the user: {name}"
-        module.fail_json(msg=msg, rc=rc, stdout=stdout, stderr=stderr)
-    keys = stdout.splitlines()[0].split(':')
-    values = stdout.splitlines()[1].split(':')
-    user_attrs = dict(zip(keys, values))
-
-    # Adding the load module to the command so that the correct user's attributes are changed.
-    load_module_opts = f"-R {load_module} "
-
     # Now loop over every key-value in attributes
-    opts = ""
-    cmd = ""
+    changed = []
     for attr, val in attributes.items():
-        pattern = re.compile(r'(yes|true|always|no|false|never)', re.IGNORECASE)
-        if val in [True, False] or re.match(pattern, str(val)):
-            val = str(val).lower()
+        sval = str(val).lower()
+        if val is True or val is False or sval in _BOOLISH:
+            val = sval
         # For idempotency, we compare what Anisble whats the value to be
         #  compared to what is already set
         # Only add attr=val to the opts list they're different. No reason to
         #  if the values are identical!
 
         if str(user_attrs[attr]) != str(val):
-            opts += f"{attr}=\"{val}\" "
-            opts = load_module_opts + opts
+            changed.append(f"{attr}={val}")
 
-    if opts:
-        cmd = f"chuser {opts} {name}"
-    if not cmd:
+    if not changed:
         # No change sare necessary.  It's best to return None instead of an empty string
-        cmd = None
-    return cmd
+        return None
+    # Adding the load module to the command so that the correct user's attributes are changed.
+    return ['chuser', '-R', load_module] + changed + [name]
 
 
-def parse_lsuserf_output(stdout):
+def parse_lsuserc_output(stdout):
     '''
-    parse_lsuserf_output returns a dict with all values parsed from
-    lsuser -f output.
+    parse_lsuserc_output returns a dict with all values parsed from
+    lsuser -C output.
 
     argument:
-        stdout:  List of lines. Output from lsuser -f.
+        stdout:  Output from lsuser -C, a header line of attribute names
+                 followed by a line of values, both colon separated.
     return:
         (dict):  Attributes in python dict.
     '''
-    attrs = {}
-    for line in stdout.splitlines():
-        if '=' in line:
-            attr, value = line.split('=')
-            attr = attr.strip()
-            value = value.strip()
-            if value != "":
-                attrs[attr] = value
-    return attrs
+    header, _, rest = stdout.partition('\n')
+    values = rest.partition('\n')[0]
+    return dict(zip(header.split(':'), values.split(':')))
 
 
 def check_LDAP(module):
@@ -230,19 +240,17 @@ def get_user_attrs(module):
 
     argument:
         module  (dict): The Ansible module
+    note:
+        Exits with fail_json in case of error
     return:
         (dict): User attributes
     '''
     name = module.params['name']
-    cmd = "lsuser -f "
-    load_module = module.params['load_module']
-    load_module_opts = f" -R {load_module} "
-    cmd += load_module_opts
-    cmd += name
-    rc, stdout, stderr = module.run_command(cmd)
-    if rc != 0 and stderr:
-        return {}
-    return parse_lsuserf_output(stdout)
+    rc, stdout, stderr = run_lsuser(module)
+    if rc != 0:
+        msg = f"\nFailed to validate attributes for the user: {name}"
+        module.fail_json(msg=msg, rc=rc, stdout=stdout, stderr=stderr)
+    return parse_lsuserc_output(stdout)
 
 
 def changed_attrs(module, current):
@@ -257,12 +265,15 @@ def changed_attrs(module, current):
     return:
         (dict): Changed user attributes
     '''
-    if module.params['attributes']:
-        newattrs = module.params['attributes']
-        changed = {k: newattrs[k] for k in newattrs if k
-                   in current and str(newattrs[k]) != str(current[k])}
-        return changed
-    return None
+    newattrs = module.params['attributes']
+    if not newattrs:
+        return None
+    changed = {}
+    for attr, val in newattrs.items():
+        cur = current.get(attr)
+        if cur is not None and str(val) != str(cur):
+            changed[attr] = val
+    return changed
 
 
 def modify_user(module):
@@ -278,19 +289,27 @@ def modify_user(module):
         (message for command, changed status)
     '''
 
-    name = module.params['name']
+    params = module.params
+    if params['attributes'] is None and params['password'] is None:
+        return ("No changes were made.", False)
+
+    name = params['name']
     msg = None
     changed = False
-    # Get current user attributes
-    current_attrs = get_user_attrs(module)
-    # Get user attributes to change
-    attrs = changed_attrs(module, current_attrs)
-    # Redefine attributes
-    module.params['attributes'] = attrs
-    # Get + Run chuser commands
-    cmd = get_chuser_command(module)
+    cmd = None
+    if params['attributes'] is not None:
+        # Get current user attributes, lsuser -C is run only once and
+        # its output serves both the diff and the chuser command.
+        current_attrs = get_user_attrs(module)
+        # Get user attributes to change
+        attrs = changed_attrs(module, current_attrs)
+        # Redefine attributes
+        params['attributes'] = attrs
+        # Get + Run chuser commands
+        cmd = get_chuser_command(module, current_attrs)
     if cmd is not None:
         rc, stdout, stderr = module.run_command(cmd)
+        invalidate_lsuser(module)
         if rc != 0:
             msg = f"\nFailed to modify attributes for the user: {name}"
             module.fail_json(msg=msg, rc=rc, stdout=stdout, stderr=stderr)
@@ -299,7 +318,7 @@ def modify_user(module):
         changed = True
 
     # Change user password
-    if module.params['password'] is not None:
+    if params['password'] is not None:
         msg_pass = change_password(module)
         if msg is not None:
             msg += msg_pass
@@ -327,29 +346,25 @@ def create_user(module):
     return:
         Message for successful command.
     '''
-    attributes = module.params['attributes']
-    name = module.params['name']
-    opts = ""
-    load_module_opts = None
+    params = module.params
+    attributes = params['attributes']
+    name = params['name']
     msg = ""
 
     # Adding the load module to the command so that the user is created at the right location.
-    load_module_opts = f"-R {module.params['load_module']} "
-
+    cmd = ['mkuser', '-R', params['load_module']]
     if attributes is not None:
-        for attr, val in attributes.items():
-            opts += f"{attr}=\"{val}\" "
-        if load_module_opts is not None:
-            opts = load_module_opts + opts
-    cmd = f"mkuser {opts} {name}"
+        cmd += [f"{attr}={val}" for attr, val in attributes.items()]
+    cmd.append(name)
     rc, stdout, stderr = module.run_command(cmd)
+    invalidate_lsuser(module)
     if rc != 0:
         msg = f"Failed to create user: {name}"
         module.fail_json(msg=msg, rc=rc, stdout=stdout, stderr=stderr)
     else:
         msg = f"Username is created SUCCESSFULLY: {name}"
 
-    if module.params['password'] is not None:
+    if params['password'] is not None:
         msg_pass = change_password(module)
         msg += msg_pass
     return msg
@@ -367,20 +382,18 @@ def remove_user(module):
     return:
         Message for successfull command
     '''
-    name = module.params['name']
-    if module.params['load_module'] == 'LDAP':
-        cmd = ['rmuser']
-        load_module = module.params['load_module']
-        load_module_opts = f"{load_module}"
-        load_opt = "-R"
-        cmd.append(load_opt)
-        cmd.append(load_module_opts)
+    params = module.params
+    name = params['name']
+    load_module = params['load_module']
+    if load_module == 'LDAP':
+        cmd = ['rmuser', '-R', load_module]
     else:
         cmd = ['userdel']
-        if module.params['remove_homedir']:
+        if params['remove_homedir']:
             cmd.append('-r')
     cmd.append(name)
     rc, stdout, stderr = module.run_command(cmd)
+    invalidate_lsuser(module)
 
     if rc != 0:
         msg = f"Unable to remove the user name: {name}"
@@ -401,19 +414,15 @@ def user_exists(module):
         True if the user exists
         False if the user does not exist
     '''
-    cmd = "lsuser "
-    load_module = module.params['load_module']
-    name = module.params['name']
-
-    # Adding the load module to the command so that the user's
-    # existence is checked at the right location.
-    load_module_opts = f"-R {load_module}"
-    cmd += load_module_opts
-    cmd += f" {name}"
-
-    rc = module.run_command(cmd)[0]
+    # lsuser -C is used so that the attributes fetched here can be
+    # reused by get_user_attrs without running lsuser again.
+    rc = run_lsuser(module)[0]
     if rc == 0:
         return True
+    # lsuser also fails when LDAP is not configured, only check for it
+    # then so that the common path does not pay for it.
+    if module.params['load_module'] == "LDAP":
+        check_LDAP(module)
     return False
 
 
@@ -429,18 +438,20 @@ def change_password(module):
     return:
         Message for successful command
     '''
-    name = module.params['name']
-    passwd = module.params['password']
-    change_passwd_on_login = module.params['change_passwd_on_login']
-    load_module = module.params['load_module']
-
-    if change_passwd_on_login:
-        cmd = f"echo \'{name}:{passwd}\' | chpasswd -e"
-    else:
-        cmd = f"echo \'{name}:{passwd}\' | chpasswd -e -c"
-
-    cmd += f" -R {load_module}"
-    pass_rc, pass_out, pass_err = module.run_command(cmd, use_unsafe_shell=True)
+    params = module.params
+    name = params['name']
+    passwd = params['password']
+    change_passwd_on_login = params['change_passwd_on_login']
+    load_module = params['load_module']
+
+    cmd = ['chpasswd', '-e']
+    if not change_passwd_on_login:
+        cmd.append('-c')
+    cmd += ['-R', load_module]
+
+    # The name:password pair is fed on stdin so that it never shows up
+    # in the process table and no shell is needed.
+    pass_rc, pass_out, pass_err = module.run_command(cmd, data=f"{name}:{passwd}")
     if pass_rc != 0:
         msg = f"\nFailed to set password for the user: {name}"
         module.fail_json(msg=msg, rc=pass_rc, stdout=pass_out, stderr=pass_err)
@@ -467,11 +478,9 @@ def main():
     msg = ""
     changed = False
 
-    name = module.params['name']
-    state = module.params['state']
-
-    if module.params['load_module'] == "LDAP":
-        check_LDAP(module)
+    params = module.params
+    name = params['name']
+    state = params['state']
 
     if state == 'absent':
         if user_exists(module):
@@ -486,7 +495,7 @@ def main():
         else:
             msg = f"User {name} already exists."
 
-            if module.params['attributes'] is None and module.params['password'] is None:
+            if params['attributes'] is None and params['password'] is None:
                 msg = f"Provide attributes to be changed for the user: {name}"
             else:
                 msg, changed = modify_user(module)
@@ -37,6 +37,14 @@ class TestRouteCommandFunctions(unittest.TestCase):
 
         self.module.params = params
 
+        # Parameters for a network route with a gateway
+        self.net_params = {
+            "destination": "192.168.1.4",
+            "prefixlen": 24,
+            "flags": "net",
+            "gateway": "192.168.1.1",
+        }
+
         # Mock command return values
         rc, stdout, stderr = 0, "sample stdout", "sample stderr"
         self.module.run_command.return_value = (rc, stdout, stderr)
@@ -67,6 +75,20 @@ class TestRouteCommandFunctions(unittest.TestCase):
         self.assertEqual(len(routing_table), 2)
         self.assertEqual(gateways, ["192.168.1.1", "192.168.1.2"])
 
+    def test_parse_routing_table_skips_headers(self):
+        stdout = ("Routing tables\n"
+                  "Destination        Gateway           Flags   Refs     Use  If   Exp  Groups\n"
+                  "\n"
+                  "Route tree for Protocol Family 2 (Internet):\n"
+                  "default            192.168.1.1       UG        1      123 en0      -      -\n"
+                  "10.0.0.0/24        192.168.1.2       UG        0        5 en0      -      -\n"
+                  "127/8              127.0.0.1         U         2      456 lo0      -      -\n"
+                  "-\n")
+        self.module.run_command.return_value = (0, stdout, "")
+        routing_table, gateways = route.parse_routing_table(self.module)
+        self.assertEqual([str(network) for network in routing_table], ["10.0.0.0/24", "127.0.0.0/8"])
+        self.assertEqual(gateways, ["192.168.1.2", "127.0.0.1"])
+
     def test_parse_routing_table_failure(self):
         self.module.run_command.return_value = (1, "", "Error fetching routing table")
         with self.assertRaises(AnsibleFailJson) as result:
@@ -106,82 +128,31 @@ class TestRouteCommandFunctions(unittest.TestCase):
         self.assertEqual(result, "192.168.1.0")
 
     def test_build_route_command_flush(self):
-        self.module.params = {
-            "flush": True
-        }
+        self.module.params["flush"] = True
         cmd = route.build_route_command(self.module)
         self.assertEqual(cmd, "route -f")
 
     def test_build_route_command_with_destination(self):
-        self.module.params = {
-            "action": "add",
+        self.module.params.update({
             "destination": "192.168.1.1",
-            "prefixlen": None,
-            "flags": "host",
-            "flush": False,
-            "numeric": False,
-            "ioctl_preference": False,
-            "verbose": False,
             "gateway": "192.168.1.254",
-            "netmask": None,
-            "arguments": None,
-            "family": None
-        }
+        })
         cmd = route.build_route_command(self.module)
         self.assertEqual(cmd, "route add -host 192.168.1.1 192.168.1.254")
 
     def test_build_route_command_with_net(self):
-        self.module.params = {
-            "action": "add",
-            "destination": "192.168.1.4",
-            "prefixlen": 24,
-            "flags": "net",
-            "flush": False,
-            "numeric": False,
-            "ioctl_preference": False,
-            "verbose": False,
-            "gateway": "192.168.1.1",
-            "netmask": None,
-            "arguments": None,
-            "family": None
-        }
+        self.module.params.update(self.net_params)
         cmd = route.build_route_command(self.module)
         self.assertEqual(cmd, "route add -net 192.168.1.4 -prefixlen 24 192.168.1.1")
 
     def test_run_route_command_success(self):
-        self.module.params = {
-            "action": "add",
-            "destination": "192.168.1.4",
-            "prefixlen": 24,
-            "flags": "net",
-            "flush": False,
-            "numeric": False,
-            "ioctl_preference": False,
-            "verbose": False,
-            "gateway": "192.168.1.1",
-            "netmask": None,
-            "arguments": None,
-            "family": None
-        }
+        self.module.params.update(self.net_params)
         self.module.run_command.return_value = (0, "Command executed successfully", "")
         rc, stdout, stderr, cmd = route.run_route_command(self.module)
         self.assertEqual(stdout, "Command executed successfully")
 
     def test_run_route_command_failure(self):
-        self.module.params = {
-            "action": "add",
-            "destination": "192.168.1.4",
-            "prefixlen": 24,
-            "flags": "net",
-            "flush": False,
-            "numeric": False,
-            "ioctl_preference": False,
-            "verbose": False,
-            "gateway": "192.168.1.1",
-            "netmask": None,
-            "arguments": None,
-            "family": None
-        }
+        self.module.params.update(self.net_params)
         self.module.run_command.return_value = (1, "", "Error occurred")
         with self.assertRaises(AnsibleFailJson) as result:
             route.run_route_command(self.module)
@@ -6,85 +6,87 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import unittest
+from types import MappingProxyType
 from unittest import mock
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.ibm.power_aix.plugins.modules import snap
 from .common.utils import (
-    AnsibleFailJson, fail_json
+    AnsibleExitJson, AnsibleFailJson, exit_json, fail_json
 )
 
+# Parameters for snap module, read-only so that a test can only change its copy
+_DEFAULT_PARAMS = MappingProxyType(dict(
+    all_info=False,
+    compress=False,
+    general_info=False,
+    live_kernel=False,
+    hacmp=False,
+    reset=False,
+    file_system_info=False,
+    collects_dump=False,
+    installation_info=False,
+    kernel_info=False,
+    security_info=False,
+    workload_manager_info=False,
+    hardware_info=False,
+))
+
+# (rc, stdout, stderr) returned by run_command unless a test sets its own
+_DEFAULT_RC = (0, "sample stdout", "sample stderr")
+
+# options combined in test_snap_general_option_multiple_params
+_MULTI_PARAMS = MappingProxyType(dict(
+    file_system_info=True,
+    installation_info=True,
+    kernel_info=True,
+    workload_manager_info=True,
+    general_info=True,
+    security_info=True,
+    compress=True,
+))
+
 
 class TestSnapCommand(unittest.TestCase):
     def setUp(self):
         self.module = mock.Mock(spec=AnsibleModule)
         self.module.fail_json = fail_json
-        self.module.fail_json.side_effect = AnsibleFailJson
-
-        # Parameters for snap module
-        params = dict()
-        params["all_info"] = False
-        params["compress"] = False
-        params["general_info"] = False
-        params["live_kernel"] = False
-        params["hacmp"] = False
-        params["reset"] = False
-        params["file_system_info"] = False
-        params["collects_dump"] = False
-        params["installation_info"] = False
-        params["kernel_info"] = False
-        params["security_info"] = False
-        params["workload_manager_info"] = False
-        params["hardware_info"] = False
-        self.module.params = params
+
+        self.module.params = dict(_DEFAULT_PARAMS)
 
         # Mock command return values
-        rc, stdout, stderr = 0, "sample stdout", "sample stderr"
-        self.module.run_command.return_value = (rc, stdout, stderr)
+        self.module.run_command.return_value = _DEFAULT_RC
 
-    def test_snap_general_option_all_info(self):
-        self.module.params["all_info"] = True
+    def check_single_flag(self, attr, flag):
+        self.module.params[attr] = True
         cmd = snap.snap_general_option(self.module)
-        self.assertEqual(cmd, ['snap', '-a'])
+        self.assertEqual(cmd, ['snap', flag])
+
+    def test_snap_general_option_all_info(self):
+        self.check_single_flag("all_info", "-a")
 
     def test_snap_general_option_hacmp(self):
-        self.module.params["all_info"] = False
-        self.module.params["hacmp"] = True
-        cmd = snap.snap_general_option(self.module)
-        self.assertEqual(cmd, ['snap', '-e'])
+        self.check_single_flag("hacmp", "-e")
 
     def test_snap_general_option_file_system_info(self):
-        self.module.params["file_system_info"] = True
-        cmd = snap.snap_general_option(self.module)
-        self.assertEqual(cmd, ['snap', '-f'])
+        self.check_single_flag("file_system_info", "-f")
 
     def test_snap_general_option_live_kernel(self):
-        self.module.params["live_kernel"] = True
-        cmd = snap.snap_general_option(self.module)
-        self.assertEqual(cmd, ['snap', '-U'])
-
-    def test_snap_general_option_multiple_params(self):
-        self.module.params.update({
-            "file_system_info": True,
-            "installation_info": True,
-            "kernel_info": True,
-            "workload_manager_info": True,
-            "general_info": True,
-            "security_info": True,
-            "compress": True,
-        })
-        cmd = snap.snap_general_option(self.module)
-        self.assertEqual(cmd, ['snap', '-f', '-i', '-k', '-w', '-S', '-g', '-c'])
+        self.check_single_flag("live_kernel", "-U")
 
     def test_snap_general_option_hardware_info(self):
-        self.module.params["hardware_info"] = True
-        cmd = snap.snap_general_option(self.module)
-        self.assertEqual(cmd, ['snap', '-H'])
+        self.check_single_flag("hardware_info", "-H")
 
     def test_snap_general_option_collects_dump(self):
-        self.module.params["collects_dump"] = True
+        self.check_single_flag("collects_dump", "-D")
+
+    def test_snap_general_option_general_info(self):
+        self.check_single_flag("general_info", "-g")
+
+    def test_snap_general_option_multiple_params(self):
+        self.module.params.update(_MULTI_PARAMS)
         cmd = snap.snap_general_option(self.module)
-        self.assertEqual(cmd, ['snap', '-D'])
+        self.assertEqual(cmd, ['snap', '-f', '-i', '-k', '-w', '-S', '-g', '-c'])
 
     # build_snap_command function calling
     def test_build_snap_command_hacmp(self):
@@ -93,36 +95,75 @@ class TestSnapCommand(unittest.TestCase):
         cmd = snap.build_snap_command(self.module)
         self.assertEqual(cmd, ['snap', '-e'])
 
-    def test_run_snap_command_with_expect_failed(self):
-        rc, stdout, stderr = 1, "Cleanup completed. Command execution failed", "sample stderr"
-        self.module.run_command.return_value = (rc, stdout, stderr)
+    def test_build_snapsplit_command_split(self):
+        self.module.params.update({
+            "ss_filename": "snap.pax.Z",
+            "ss_size": "2",
+            "ss_machinename": "host1",
+            "ss_rejoining": False,
+        })
+        cmd = snap.build_snapsplit_command(self.module)
+        self.assertEqual(cmd, ['snapsplit', '-s', '2', '-H', 'host1', '-f', 'snap.pax.Z'])
+
+    def test_build_snapcore_command_output_dir(self):
+        self.module.params.update({
+            "sc_output_dir": "/tmp/snapcore",
+            "sc_remove_core": True,
+            "sc_core_file": "core",
+            "sc_program_name": None,
+        })
+        cmd = snap.build_snapcore_command(self.module)
+        self.assertEqual(cmd, ['snapcore', '-d', '/tmp/snapcore', '-r', 'core'])
+
+    def test_run_and_report_failed(self):
+        self.module.params["action"] = "snapcore"
+        self.module.run_command.return_value = (1, "", "snapcore failed")
         with self.assertRaises(AnsibleFailJson) as result:
-            snap.run_snap_command_with_expect(self.module)
+            snap.run_and_report(self.module, ['snapcore', 'core'], dict())
         testResult = result.exception.args[0]
         self.assertTrue(testResult['failed'])
+        self.assertEqual(testResult['rc'], 1)
+        self.assertEqual(testResult['msg'], "Unable to run the snapcore command: snapcore core")
 
-    def test_run_snap_command_with_expect_command_failed(self):
-        rc, stdout, stderr = 1, "Error occurred during cleanup", "Detailed error message"
-        self.module.run_command.return_value = (rc, stdout, stderr)
-        # `module.fail_json` raises the expected exception
+    def test_exit_check_mode(self):
+        self.module.exit_json = exit_json
+        with self.assertRaises(AnsibleExitJson) as result:
+            snap.exit_check_mode(self.module, ['snap', '-a'], dict(changed=False, cmd=''))
+        testResult = result.exception.args[0]
+        self.assertEqual(testResult['cmd'], 'snap -a')
+        self.assertTrue(testResult['changed'])
+        self.module.run_command.assert_not_called()
+
+    def test_tail_output(self):
+        self.assertEqual(snap.tail_output("short output"), "short output")
+        output = snap.tail_output("a" * 10 + "b" * 5, limit=5)
+        self.assertTrue(output.endswith("\nbbbbb"))
+        self.assertNotIn("a", output.splitlines()[-1])
+
+    def check_expect_failed(self, stdout):
+        self.module.run_command.return_value = (1, stdout, "sample stderr")
         with self.assertRaises(AnsibleFailJson) as result:
             snap.run_snap_command_with_expect(self.module)
-        exception_result = result.exception.args[0]
-        self.assertTrue(exception_result['failed'])
-
-    def test_run_snap_command_with_expect_nothing_to_clean(self):
-        rc, stdout, stderr = 0, "Cleanup completed. Nothing to clean up", "sample stderr"
-        self.module.run_command.return_value = (rc, stdout, stderr)
+        self.assertTrue(result.exception.args[0]['failed'])
+        self.module.run_command.assert_called_once_with(['snap', '-r'], data='y')
 
+    def check_expect_msg(self, stdout, msg):
+        self.module.run_command.return_value = (0, stdout, "sample stderr")
         result = snap.run_snap_command_with_expect(self.module)
-        self.assertEqual(result['msg'], "No cleanup was required.")
+        self.assertEqual(result['msg'], msg)
+        self.module.run_command.assert_called_once_with(['snap', '-r'], data='y')
 
-    def test_run_snap_command_with_expect_successfull(self):
-        rc, stdout, stderr = 0, "Cleanup completed. Command executed successfully", "sample stderr"
-        self.module.run_command.return_value = (rc, stdout, stderr)
+    def test_run_snap_command_with_expect_failed(self):
+        self.check_expect_failed("Cleanup completed. Command execution failed")
 
-        result = snap.run_snap_command_with_expect(self.module)
-        self.assertEqual(result['msg'], "Command executed successfully.")
+    def test_run_snap_command_with_expect_command_failed(self):
+        self.check_expect_failed("Error occurred during cleanup")
+
+    def test_run_snap_command_with_expect_nothing_to_clean(self):
+        self.check_expect_msg("Cleanup completed. Nothing to clean up", "No cleanup was required.")
+
+    def test_run_snap_command_with_expect_successfull(self):
+        self.check_expect_msg("Cleanup completed. Command executed successfully", "Command executed successfully.")
 
 
 if __name__ == '__main__':
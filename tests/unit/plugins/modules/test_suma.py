@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+# Copyright: (c) 2025- IBM, Inc
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import re
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.ibm.power_aix.plugins.modules import suma
+
+from .common.utils import (
+    AnsibleFailJson, fail_json, suma_metadata_path, suma_metadata_path2
+)
+
+# SP level of the sample metadata file
+_SAMPLE_SP = "7200-05-02-2114"
+
+_SUMMARY = (
+    "Summary:\n"
+    "        3 downloaded\n"
+    "        0 failed\n"
+    "        1 skipped\n"
+)
+
+
+class TestSuma(unittest.TestCase):
+    def setUp(self):
+        self.module = mock.Mock(spec=AnsibleModule)
+        self.module._debug = False
+        self.module.fail_json = fail_json
+        rc, stdout, stderr = 0, "sample stdout", "sample stderr"
+        self.module.run_command.return_value = (rc, stdout, stderr)
+
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.metadata_dir = tmpdir.name
+        self.ppc_dir = os.path.join(self.metadata_dir, 'installp', 'ppc')
+
+        # suma.py works on module level globals
+        results = dict(changed=False, msg='', stdout='', stderr='', meta={'messages': []})
+        params = dict(metadata_dir=self.metadata_dir, description="test request")
+        for name, value in (('module', self.module), ('results', results), ('suma_params', params)):
+            patcher = mock.patch.object(suma, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        with open(suma_metadata_path, "r") as f:
+            self.metadata = f.read()
+
+    def write_metadata(self, name, sp_version, age=0):
+        """write a metadata file for sp_version in the ppc directory"""
+        os.makedirs(self.ppc_dir, exist_ok=True)
+        path = os.path.join(self.ppc_dir, name)
+        with open(path, "w") as f:
+            f.write(self.metadata.replace(_SAMPLE_SP, sp_version))
+        if age:
+            mtime = time.time() - age
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def write_done(self, tl, age=0):
+        """write the marker of a completed metadata request for tl"""
+        os.makedirs(self.ppc_dir, exist_ok=True)
+        path = os.path.join(self.ppc_dir, tl + ".done")
+        with open(path, "w"):
+            pass
+        if age:
+            mtime = time.time() - age
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def suma_metadata(self, files, rc=0):
+        """run_command side effect of a suma metadata request writing files"""
+        def run_command(cmd, **kwargs):
+            for name, sp_version in files.items():
+                self.write_metadata(name, sp_version)
+            return (rc, "", "" if rc == 0 else "suma metadata failed")
+        return run_command
+
+    def test_find_sp_version(self):
+        self.assertEqual(suma.find_sp_version(suma_metadata_path), _SAMPLE_SP)
+
+    def test_find_sp_version_sp_line(self):
+        # metadata with the SP element alone on its line, the format the
+        # previous line by line parser expected
+        with open(suma_metadata_path2, "r") as f:
+            for line in f:
+                matched = re.match(r"^<SP name=\"([0-9]{4}-[0-9]{2}-[0-9]{2}-[0-9]{4})\">$", line.rstrip())
+                if matched:
+                    break
+        self.assertEqual(matched.group(1), "7200-05-03-2148")
+        self.assertEqual(suma.find_sp_version(suma_metadata_path2), matched.group(1))
+
+    def test_find_sp_version_namespace(self):
+        path = os.path.join(self.metadata_dir, "7200-05-03.xml")
+        with open(path, "w") as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                    '<FixRepository xmlns="http://www.ibm.com/suma/metadata">\n'
+                    '  <SP name="7200-05" />\n'
+                    '  <SP name="7200-05-03-2148"><Fileset name="bos.rte" /></SP>\n'
+                    '</FixRepository>\n')
+        self.assertEqual(suma.find_sp_version(path), "7200-05-03-2148")
+
+    def test_find_sp_version_parse_error(self):
+        path = os.path.join(self.metadata_dir, "7200-05-03.xml")
+        with open(path, "w") as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n<FixRepository>\n  <Release name="7200"\n')
+        self.assertEqual(suma.find_sp_version(path), "")
+        self.assertIn("Cannot parse metadata file", self.module.log.call_args[0][0])
+
+    def test_compute_rq_name_cache_hit(self):
+        self.write_metadata("7200-05-01.xml", "7200-05-01-2038")
+        self.write_metadata("7200-05-02.xml", "7200-05-02-2114")
+        self.write_done("7200-05")
+        rq_name = suma.compute_rq_name('SP', 'tl', '7200-05', True)
+        self.assertEqual(rq_name, "7200-05-02-2114")
+        self.module.run_command.assert_not_called()
+
+    def test_compute_rq_name_cache_without_marker(self):
+        # files left by an interrupted request are not trusted
+        self.write_metadata("7200-05-01.xml", "7200-05-01-2038")
+        self.module.run_command.side_effect = self.suma_metadata({
+            "7200-05-01.xml": "7200-05-01-2038",
+            "7200-05-02.xml": "7200-05-02-2114",
+        })
+        rq_name = suma.compute_rq_name('SP', 'tl', '7200-05', True)
+        self.assertEqual(rq_name, "7200-05-02-2114")
+        self.assertEqual(self.module.run_command.call_count, 1)
+        self.assertTrue(os.path.isfile(os.path.join(self.ppc_dir, "7200-05.done")))
+
+    def test_compute_rq_name_cache_stale(self):
+        stale = self.write_metadata("7200-05-01.xml", "7200-05-01-2038", age=suma._METADATA_CACHE_TIME + 60)
+        self.write_metadata("7200-05-02.xml", "7200-05-02-2114")
+        self.write_done("7200-05")
+        self.module.run_command.side_effect = self.suma_metadata({"7200-05-03.xml": "7200-05-03-2148"})
+
+        rq_name = suma.compute_rq_name('SP', 'tl', '7200-05', True)
+        self.assertEqual(rq_name, "7200-05-03-2148")
+        self.assertEqual(self.module.run_command.call_count, 1)
+        cmd = self.module.run_command.call_args[0][0]
+        self.assertIn('Action=Metadata', cmd)
+        self.assertIn('FilterML=7200-05', cmd)
+        # outdated files of the TL are removed before the request
+        self.assertFalse(os.path.exists(stale))
+        self.assertFalse(os.path.exists(os.path.join(self.ppc_dir, "7200-05-02.xml")))
+
+    def test_compute_rq_name_cache_failed_request(self):
+        stale = self.write_metadata("7200-05-02.xml", "7200-05-02-2114", age=suma._METADATA_CACHE_TIME + 60)
+        self.write_done("7200-05", age=suma._METADATA_CACHE_TIME + 60)
+        self.module.run_command.side_effect = self.suma_metadata({"7200-05-01.xml": "7200-05-01-2038"}, rc=1)
+
+        with self.assertRaises(AnsibleFailJson) as result:
+            suma.compute_rq_name('SP', 'tl', '7200-05', True)
+        self.assertIn("failed with return code 1", result.exception.args[0]['msg'])
+        # neither the partial nor the outdated files are left for the next run
+        self.assertFalse(os.path.exists(stale))
+        self.assertFalse(os.path.exists(os.path.join(self.ppc_dir, "7200-05-01.xml")))
+        self.assertFalse(os.path.exists(os.path.join(self.ppc_dir, "7200-05.done")))
+
+        self.module.run_command.side_effect = self.suma_metadata({
+            "7200-05-01.xml": "7200-05-01-2038",
+            "7200-05-03.xml": "7200-05-03-2148",
+        })
+        rq_name = suma.compute_rq_name('SP', 'tl', '7200-05', True)
+        self.assertEqual(rq_name, "7200-05-03-2148")
+        self.assertEqual(self.module.run_command.call_count, 2)
+
+    def test_compute_rq_name_short_sp_missing(self):
+        self.write_metadata("7200-05-01.xml", "7200-05-01-2038")
+        self.write_done("7200-05")
+        self.module.run_command.side_effect = self.suma_metadata({
+            "7200-05-01.xml": "7200-05-01-2038",
+            "7200-05-02.xml": "7200-05-02-2114",
+        })
+
+        rq_name = suma.compute_rq_name('SP', 'sp_short', '7200-05-02', False)
+        self.assertEqual(rq_name, "7200-05-02-2114")
+        self.assertEqual(self.module.run_command.call_count, 1)
+
+    def test_compute_rq_name_short_sp_not_found(self):
+        self.module.run_command.side_effect = self.suma_metadata({"7200-05-01.xml": "7200-05-01-2038"})
+        with self.assertRaises(AnsibleFailJson) as result:
+            suma.compute_rq_name('SP', 'sp_short', '7200-05-02', False)
+        self.assertIn("Cannot determine SP version", result.exception.args[0]['msg'])
+
+    def test_parse_suma_summary_in_tail(self):
+        # an earlier count line must not override the final summary
+        stdout = "        9 downloaded\n" + "download /usr/sys/inst.images/bos.rte\n" * 200 + _SUMMARY
+        self.assertEqual(suma.parse_suma_summary(stdout), (3, 0, 1))
+
+    def test_parse_suma_summary_before_tail(self):
+        stdout = _SUMMARY + "Partition Id: 1, Extend=y\n" * 200
+        self.assertGreater(len(stdout) - len(_SUMMARY), suma._SUMMARY_TAIL_SIZE)
+        self.assertEqual(suma.parse_suma_summary(stdout), (3, 0, 1))
+
+    def test_parse_suma_summary_missing(self):
+        self.assertEqual(suma.parse_suma_summary("No fixes found\n"), (0, 0, 0))
+
+    def test_sched_time_matches_check_time(self):
+        # minute, hour, day, month, weekday ranges
+        ranges = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+        values = ['*', '', '-1', '1x', '*\n', '1\n'] + [str(i) for i in range(100)] + ['%03d' % i for i in range(100)]
+        for field, (mini, maxi) in enumerate(ranges):
+            for val in values:
+                sched = ['*'] * 5
+                sched[field] = val
+                self.assertEqual(bool(suma._RE_SCHED.match(' '.join(sched))),
+                                 suma.check_time(val, mini, maxi),
+                                 msg=' '.join(sched))
+
+    def test_suma_download_save_task_skips_preview(self):
+        suma.suma_params.update(dict(
+            action='download', oslevel=_SAMPLE_SP, last_sp=False, save_task=True,
+            download_dir=os.path.join(self.metadata_dir, 'lpp'), download_only=True,
+            extend_fs=True,
+        ))
+        self.module.run_command.return_value = (0, _SUMMARY, "")
+
+        suma.suma_download()
+        self.assertEqual(self.module.run_command.call_count, 1)
+        cmd = self.module.run_command.call_args[0][0]
+        self.assertIn('Action=Download', cmd)
+        self.assertIn('-w', cmd)
+        self.assertTrue(suma.results['changed'])
+
+    def test_suma_download_previews_first(self):
+        suma.suma_params.update(dict(
+            action='download', oslevel=_SAMPLE_SP, last_sp=False, save_task=False,
+            download_dir=os.path.join(self.metadata_dir, 'lpp'), download_only=True,
+            extend_fs=True,
+        ))
+        self.module.run_command.return_value = (0, _SUMMARY, "")
+
+        suma.suma_download()
+        actions = [call[0][0][5] for call in self.module.run_command.call_args_list]
+        self.assertEqual(actions, ['Action=Preview', 'Action=Download'])
+
+
+if __name__ == '__main__':
+    unittest.main()
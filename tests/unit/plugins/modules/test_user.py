@@ -28,6 +28,7 @@ class TestCreateUser(unittest.TestCase):
         params["password"] = "pass1234"
         params["load_module"] = "files"
         self.module.params = params
+        user._LSUSER_CACHE.clear()
         rc, stdout, stderr = 0, "sample stdout", "sample stderr"
         self.module.run_command.return_value = (rc, stdout, stderr)
 
@@ -53,6 +54,8 @@ class TestCreateUser(unittest.TestCase):
     def test_success_create_user_with_password_with_attributes(self):
         self.module.params["attributes"] = {"home": "/test/home/test123", "data": "1272"}
         msg = user.create_user(self.module)
+        self.module.run_command.assert_any_call(
+            ['mkuser', '-R', 'files', 'home=/test/home/test123', 'data=1272', 'test123'])
         pattern = 'Username is created SUCCESSFULLY: %s' % self.module.params["name"]
         self.assertRegexpMatches(msg, pattern)
         pattern = "\nPassword is set successfully for the user: %s" % self.module.params['name']
@@ -100,7 +103,6 @@ class TestCreateUser(unittest.TestCase):
         rc, stdout, stderr = 0, "sample stdout", "sample stderr"
 
         self.module.run_command.side_effect = [
-            (rc, self.lsuser_output1, stderr),
             (rc, stdout, stderr)
         ]
 
@@ -108,6 +110,53 @@ class TestCreateUser(unittest.TestCase):
         pattern = "\nPassword is set successfully for the user: %s" % self.module.params['name']
         self.assertRegexpMatches(msg, pattern)
 
+    def test_success_user_modify_single_lsuser(self):
+        self.module.params["password"] = None
+        self.module.params["attributes"] = {"home": "/test/home/test123", "shell": "/usr/bin/ksh"}
+        rc, stdout, stderr = 0, "sample stdout", "sample stderr"
+
+        self.module.run_command.side_effect = [
+            (rc, self.lsuser_output1, stderr),
+            (rc, stdout, stderr)
+        ]
+
+        msg, changed = user.modify_user(self.module)
+        self.assertTrue(changed)
+        self.assertEqual(self.module.run_command.call_count, 2)
+        self.module.run_command.assert_called_with(['chuser', '-R', 'files', 'home=/test/home/test123', 'test123'])
+
+    def test_get_chuser_command_boolean_values(self):
+        self.module.params["attributes"] = {"account_locked": True, "rlogin": "TRUE", "login": "Yes"}
+        user_attrs = {"account_locked": "false", "rlogin": "true", "login": "true"}
+        cmd = user.get_chuser_command(self.module, user_attrs)
+        self.assertEqual(cmd, ['chuser', '-R', 'files', 'account_locked=true', 'login=yes', 'test123'])
+
+    def test_user_exists_reuses_lsuser(self):
+        self.module.params["password"] = None
+        self.module.params["attributes"] = {"home": "/home/tester"}
+        self.module.run_command.return_value = (0, self.lsuser_output1, "")
+
+        self.assertTrue(user.user_exists(self.module))
+        msg, changed = user.modify_user(self.module)
+        self.assertFalse(changed)
+        self.module.run_command.assert_called_once_with(['lsuser', '-R', 'files', '-C', 'test123'])
+
+    def test_user_modify_nothing_to_change(self):
+        self.module.params["password"] = None
+        msg, changed = user.modify_user(self.module)
+        self.assertEqual(msg, "No changes were made.")
+        self.assertFalse(changed)
+        self.module.run_command.assert_not_called()
+
+    def test_user_exists_ldap_not_configured(self):
+        self.module.params["load_module"] = "LDAP"
+        self.module.run_command.return_value = (1, "", "sample stderr")
+        with self.assertRaises(AnsibleFailJson) as result:
+            user.user_exists(self.module)
+        testResult = result.exception.args[0]
+        self.assertTrue(testResult['failed'])
+        self.module.run_command.assert_called_with("ls-secldapclntd")
+
     def test_fail_user_modify(self):
         rc, stdout, stderr = 1, "sample stdout", "sample stderr"
         self.module.run_command.return_value = (rc, stdout, stderr)
@@ -131,6 +180,8 @@ class TestCreateUser(unittest.TestCase):
 
     def test_success_change_password(self):
         msg = user.change_password(self.module)
+        self.module.run_command.assert_called_once_with(
+            ['chpasswd', '-e', '-R', 'files'], data='test123:pass1234')
         testMsg = "\nPassword is set successfully for the user: %s" % self.module.params['name']
         self.assertEqual(msg, testMsg)
 